@@ -0,0 +1,150 @@
+"""
+Optional Redis-backed persistence for engagement data
+Keeps the FastAPI process flat-memory and survives restarts; falls back to
+the in-process stores in main.py when REDIS_URL is unset
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    aioredis = None
+    REDIS_AVAILABLE = False
+
+# zstd level 3 shrinks session blobs (repeated event structure, monotonic
+# timestamps) 5-10x; decode runs at ~1 GB/s so reads barely notice
+try:
+    import zstandard as zstd
+
+    _compressor = zstd.ZstdCompressor(level=3)
+    _decompressor = zstd.ZstdDecompressor()
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+redis_client = (
+    aioredis.from_url(REDIS_URL, decode_responses=False)
+    if REDIS_AVAILABLE and REDIS_URL
+    else None
+)
+
+
+def enabled() -> bool:
+    return redis_client is not None
+
+
+async def push_snapshots(session_id: str, snapshots: List[Dict]) -> int:
+    """
+    RPUSH a batch of snapshots in one pipelined round trip
+
+    Returns the new list length for the session.
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for snapshot in snapshots:
+            pipe.rpush(f"eng:{session_id}", orjson.dumps(snapshot))
+        results = await pipe.execute()
+    return results[-1]
+
+
+async def get_snapshots(session_id: str) -> List[Dict]:
+    """Fetch all snapshots for a session (LRANGE + orjson decode)"""
+    raw = await redis_client.lrange(f"eng:{session_id}", 0, -1)
+    return [orjson.loads(item) for item in raw]
+
+
+async def append_mouse_chunk(session_id: str, chunk: bytes) -> int:
+    """
+    APPEND one packed binary mouse-event chunk to the session's byte string
+
+    Returns the total byte length, so the caller derives the accumulated
+    event count without a read.
+    """
+    return await redis_client.append(f"mouse:{session_id}", chunk)
+
+
+async def get_mouse_chunks_raw(session_id: str) -> Optional[bytes]:
+    """All appended mouse-event records as one packed byte string"""
+    return await redis_client.get(f"mouse:{session_id}")
+
+
+def _maybe_decompress(raw: Optional[bytes]) -> Optional[bytes]:
+    """Transparently inflate zstd-framed blobs (plain blobs pass through)"""
+    if raw is not None and raw[:4] == _ZSTD_MAGIC and ZSTD_AVAILABLE:
+        return _decompressor.decompress(raw)
+    return raw
+
+
+async def set_session(session_id: str, session: Dict):
+    """Store a session blob (zstd-compressed); shared across uvicorn workers"""
+    payload = orjson.dumps(session)
+    if ZSTD_AVAILABLE:
+        payload = _compressor.compress(payload)
+    await redis_client.set(f"sess:{session_id}", payload)
+
+
+async def get_session(session_id: str) -> Optional[Dict]:
+    raw = _maybe_decompress(await redis_client.get(f"sess:{session_id}"))
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def get_session_raw(session_id: str) -> Optional[bytes]:
+    """Stored session JSON bytes, for handlers that relay them unchanged"""
+    return _maybe_decompress(await redis_client.get(f"sess:{session_id}"))
+
+
+async def set_progress(user_id: str, progress: Dict):
+    await redis_client.set(f"prog:{user_id}", orjson.dumps(progress))
+
+
+async def get_progress(user_id: str) -> Optional[Dict]:
+    raw = await redis_client.get(f"prog:{user_id}")
+    return orjson.loads(raw) if raw is not None else None
+
+
+def progress_key(user_id: str) -> str:
+    return f"prog:{user_id}"
+
+
+async def set_profile(user_id: str, profile: Dict):
+    await redis_client.set(f"prof:{user_id}", orjson.dumps(profile))
+
+
+async def get_profile(user_id: str) -> Optional[Dict]:
+    raw = await redis_client.get(f"prof:{user_id}")
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def set_plan(plan_id: str, plan: Dict):
+    await redis_client.set(f"plan:{plan_id}", orjson.dumps(plan))
+
+
+async def get_plan(plan_id: str) -> Optional[Dict]:
+    raw = await redis_client.get(f"plan:{plan_id}")
+    return orjson.loads(raw) if raw is not None else None
+
+
+async def set_analytics(session_id: str, payload: bytes):
+    """Store a pre-serialized analytics blob for O(1) reads"""
+    await redis_client.set(f"analytics:{session_id}", payload)
+
+
+async def get_analytics_raw(session_id: str) -> Optional[bytes]:
+    return await redis_client.get(f"analytics:{session_id}")
+
+
+async def set_many(pairs: List[Tuple[str, bytes]]):
+    """Flush a batch of raw SETs in one pipelined round trip"""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, value in pairs:
+            pipe.set(key, value)
+        await pipe.execute()
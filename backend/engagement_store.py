@@ -0,0 +1,254 @@
+"""
+Structure-of-Arrays storage for engagement snapshots
+Holds each session's snapshot stream as column-wise NumPy arrays with
+amortized-doubling appends, so analytics run as vector reductions instead
+of Python loops over per-snapshot dicts
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+_INITIAL_CAPACITY = 64
+
+# Scalar snapshot fields stored as columns (name -> dtype, missing value)
+_SCALAR_COLUMNS = [
+    ("timestamp", np.int64, 0),
+    ("isFocused", np.uint8, 0),
+    ("mouseX", np.float32, 0.0),
+    ("mouseY", np.float32, 0.0),
+    ("hasInteraction", np.uint8, 0),
+    ("attentionScore", np.float32, 0.0),
+    ("engagementScore", np.float32, 0.0),
+    ("frustrationLevel", np.float32, 0.0),
+    ("responseLatency", np.float32, np.nan),
+]
+
+# Optional nested payloads kept out of the column store
+_NESTED_FIELDS = ("eyeGaze", "audioFeatures", "microexpression", "gesture")
+
+
+def _delta_encode(timestamp: np.ndarray):
+    """
+    Split epoch-millisecond timestamps into (t0, consecutive deltas)
+
+    Event streams are near-monotonic with small gaps, so the delta column
+    usually fits uint16 - a quarter of the int64 original; streams with
+    negative or >65s gaps keep the full-width int64 deltas (np.diff of a
+    mixed-scale stream can exceed int32, which would wrap silently).
+    """
+    if timestamp.size == 0:
+        return 0, np.empty(0, dtype=np.uint16)
+    dt = np.diff(timestamp)
+    if dt.size and (dt.min() < 0 or dt.max() > np.iinfo(np.uint16).max):
+        return int(timestamp[0]), dt
+    return int(timestamp[0]), dt.astype(np.uint16)
+
+
+def _delta_decode(t0: int, dt: np.ndarray, n: int) -> np.ndarray:
+    """Rebuild the int64 timestamp column with one cumulative sum"""
+    out = np.empty(n, dtype=np.int64)
+    if n == 0:
+        return out
+    out[0] = t0
+    out[1:] = t0 + np.cumsum(dt, dtype=np.int64)
+    return out
+
+
+@dataclass(slots=True)
+class MouseEventsSoA:
+    """
+    Mouse event stream as parallel arrays instead of a list of per-event
+    dicts: linear scans for analytics, and the time column lives as
+    delta-encoded uint16 (~20 bytes per event total)
+    """
+
+    x: np.ndarray  # float32
+    y: np.ndarray  # float32
+    t0: int  # epoch ms of the first event
+    dt: np.ndarray  # uint16/int64 deltas between consecutive events
+
+    @classmethod
+    def from_arrays(
+        cls, x: np.ndarray, y: np.ndarray, timestamp: np.ndarray
+    ) -> "MouseEventsSoA":
+        t0, dt = _delta_encode(timestamp)
+        return cls(x=x, y=y, t0=t0, dt=dt)
+
+    @classmethod
+    def from_dicts(cls, events: List[Dict]) -> "MouseEventsSoA":
+        n = len(events)
+        x = np.empty(n, dtype=np.float32)
+        y = np.empty(n, dtype=np.float32)
+        timestamp = np.empty(n, dtype=np.int64)
+        for i, event in enumerate(events):
+            x[i] = event["x"]
+            y[i] = event["y"]
+            timestamp[i] = event["timestamp"]
+        return cls.from_arrays(x, y, timestamp)
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        """Decoded int64 timestamp column"""
+        return _delta_decode(self.t0, self.dt, self.x.size)
+
+    def to_dicts(self) -> List[Dict]:
+        """Reconstruct API-compatible event dicts (read endpoint only)"""
+        return [
+            {"x": float(x), "y": float(y), "timestamp": int(t)}
+            for x, y, t in zip(self.x, self.y, self.timestamp)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass(slots=True)
+class GazePointsSoA:
+    """EyeGazePoint stream as parallel arrays; same layout as mouse events"""
+
+    x: np.ndarray  # float32
+    y: np.ndarray  # float32
+    t0: int
+    dt: np.ndarray  # uint16/int64 deltas
+    confidence: np.ndarray  # float32
+
+    @classmethod
+    def from_dicts(cls, points: List[Dict]) -> "GazePointsSoA":
+        n = len(points)
+        x = np.empty(n, dtype=np.float32)
+        y = np.empty(n, dtype=np.float32)
+        timestamp = np.empty(n, dtype=np.int64)
+        confidence = np.empty(n, dtype=np.float32)
+        for i, point in enumerate(points):
+            x[i] = point["x"]
+            y[i] = point["y"]
+            timestamp[i] = point["timestamp"]
+            confidence[i] = point["confidence"]
+        t0, dt = _delta_encode(timestamp)
+        return cls(x=x, y=y, t0=t0, dt=dt, confidence=confidence)
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        """Decoded int64 timestamp column"""
+        return _delta_decode(self.t0, self.dt, self.x.size)
+
+    def to_dicts(self) -> List[Dict]:
+        return [
+            {
+                "x": float(x),
+                "y": float(y),
+                "timestamp": int(t),
+                "confidence": float(c),
+            }
+            for x, y, t, c in zip(self.x, self.y, self.timestamp, self.confidence)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass(slots=True)
+class AttentionChecksSoA:
+    """Attention-check stream as a uint8 bitmap plus timestamps"""
+
+    passed: np.ndarray  # uint8
+    timestamp: np.ndarray  # int64
+
+    @classmethod
+    def from_dicts(cls, checks: List[Dict]) -> "AttentionChecksSoA":
+        n = len(checks)
+        passed = np.empty(n, dtype=np.uint8)
+        timestamp = np.empty(n, dtype=np.int64)
+        for i, check in enumerate(checks):
+            passed[i] = check["passed"]
+            timestamp[i] = check["timestamp"]
+        return cls(passed=passed, timestamp=timestamp)
+
+    def to_dicts(self) -> List[Dict]:
+        return [
+            {"passed": bool(p), "timestamp": int(t)}
+            for p, t in zip(self.passed, self.timestamp)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+
+class SessionColumns:
+    """Column store for one session's engagement snapshots"""
+
+    def __init__(self):
+        self._len = 0
+        self._capacity = _INITIAL_CAPACITY
+        for name, dtype, _ in _SCALAR_COLUMNS:
+            setattr(self, name, np.empty(self._capacity, dtype=dtype))
+
+        self.sessionId: Optional[str] = None
+        # Sparse nested payloads (eyeGaze etc.), keyed by snapshot index
+        self._nested: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _ensure(self, n: int):
+        """Grow columns geometrically so appends stay amortized O(1)"""
+        if n <= self._capacity:
+            return
+        while self._capacity < n:
+            self._capacity *= 2
+        for name, dtype, _ in _SCALAR_COLUMNS:
+            grown = np.empty(self._capacity, dtype=dtype)
+            grown[: self._len] = getattr(self, name)[: self._len]
+            setattr(self, name, grown)
+
+    def append(self, snapshot: Dict):
+        """Append one snapshot dict (as produced by model_dump)"""
+        self._ensure(self._len + 1)
+        i = self._len
+
+        if self.sessionId is None:
+            self.sessionId = snapshot.get("sessionId")
+
+        for name, _, missing in _SCALAR_COLUMNS:
+            value = snapshot.get(name)
+            getattr(self, name)[i] = missing if value is None else value
+
+        nested = {
+            key: snapshot[key]
+            for key in _NESTED_FIELDS
+            if snapshot.get(key) is not None
+        }
+        if nested:
+            self._nested[i] = nested
+
+        self._len += 1
+
+    def extend(self, snapshots: List[Dict]):
+        self._ensure(self._len + len(snapshots))
+        for snapshot in snapshots:
+            self.append(snapshot)
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column, trimmed to the live length"""
+        return getattr(self, name)[: self._len]
+
+    def to_dicts(self) -> List[Dict]:
+        """Reconstruct API-compatible snapshot dicts (read endpoint only)"""
+        snapshots = []
+        for i in range(self._len):
+            snapshot = {"sessionId": self.sessionId}
+            for name, dtype, missing in _SCALAR_COLUMNS:
+                value = getattr(self, name)[i]
+                if name in ("isFocused", "hasInteraction"):
+                    snapshot[name] = bool(value)
+                elif name == "timestamp":
+                    snapshot[name] = int(value)
+                elif name == "responseLatency":
+                    snapshot[name] = None if np.isnan(value) else float(value)
+                else:
+                    snapshot[name] = float(value)
+            for key in _NESTED_FIELDS:
+                snapshot[key] = self._nested.get(i, {}).get(key)
+            snapshots.append(snapshot)
+        return snapshots
@@ -5,6 +5,13 @@ Hybrid CNN + LSTM Model for Engagement Monitoring
 - Ensemble fusion for final engagement prediction
 """
 
+import os
+
+# oneDNN picks NHWC brgconv kernels on CPU; must be set before TF import
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+if os.environ.get("HYBRID_MIXED_PRECISION", "0").lower() == "bf16":
+    os.environ.setdefault("ONEDNN_DEFAULT_FPMATH_MODE", "BF16")
+
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -12,6 +19,28 @@ from tensorflow.keras import layers, models
 from typing import Dict, List, Tuple, Optional
 import json
 
+# Mixed precision runs Conv2D/Dense/LSTM in FP16 on TensorCore GPUs (~2x
+# throughput, half the activation memory). Opt-in via env var so CPU-only
+# deployments keep the default FP32 policy.
+if os.environ.get("HYBRID_MIXED_PRECISION", "0").lower() in ("1", "true", "fp16"):
+    keras.mixed_precision.set_global_policy("mixed_float16")
+elif os.environ.get("HYBRID_MIXED_PRECISION", "0").lower() == "bf16":
+    keras.mixed_precision.set_global_policy("mixed_bfloat16")
+
+# NHWC layout keeps cuDNN on the TensorCore kernel path (FP16 conv requires
+# channels-last) and avoids per-batch transposes on GPU
+keras.backend.set_image_data_format("channels_last")
+
+# Optional Numba fast path for per-request preprocessing (JIT-cached kernels);
+# falls back to the vectorized NumPy implementations below
+try:
+    import preproc_numba
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    preproc_numba = None
+    NUMBA_AVAILABLE = False
+
 
 class HybridEngagementModel:
     """
@@ -21,6 +50,10 @@ class HybridEngagementModel:
     3. Ensemble layer for final predictions
     """
 
+    # Prediction head names, in the declaration order of build_hybrid_model's
+    # outputs (used to re-key list-structured Keras outputs)
+    OUTPUT_HEADS = ("engagement_class", "attention_score", "frustration_level")
+
     def __init__(
         self,
         scanpath_shape: Tuple[int, int, int] = (50, 50, 3),  # Height, Width, Channels
@@ -35,6 +68,21 @@ class HybridEngagementModel:
         self.lstm_model = None
         self.hybrid_model = None
 
+        # Optional TensorRT engine for low-latency inference (see export_trt/load_trt)
+        self.trt_engine = None
+        self.trt_context = None
+
+        # Optional quantized TFLite interpreter for CPU-only deployments
+        self.tflite_interpreter = None
+        self._tflite_runner = None
+
+        # XLA-compiled inference step (built lazily on first predict)
+        self._predict_step = None
+
+        # Dataset-wide MFCC normalization stats (see fit_mfcc_stats)
+        self.mfcc_mean: Optional[np.ndarray] = None
+        self.mfcc_inv_std: Optional[np.ndarray] = None
+
     def build_cnn_model(self) -> keras.Model:
         """
         Build CNN for scanpath/velocity map analysis
@@ -43,17 +91,27 @@ class HybridEngagementModel:
         """
         inputs = keras.Input(shape=self.scanpath_shape, name="scanpath_input")
 
-        # Convolutional layers
-        x = layers.Conv2D(32, (3, 3), activation="relu", padding="same")(inputs)
-        x = layers.MaxPooling2D((2, 2))(x)
+        # Depthwise-separable convolutions (explicit NHWC so cuDNN/oneDNN
+        # never reorder): a k x k depthwise pass per channel plus a 1x1
+        # pointwise mix, ~8x fewer FLOPs than dense Conv2D at these widths.
+        # On the first layer the depthwise stage also gives each semantic
+        # channel (heatmap/duration/velocity) its own filter bank.
+        x = layers.SeparableConv2D(
+            32, (3, 3), activation="relu", padding="same", data_format="channels_last"
+        )(inputs)
+        x = layers.MaxPooling2D((2, 2), data_format="channels_last")(x)
         x = layers.Dropout(0.2)(x)
 
-        x = layers.Conv2D(64, (3, 3), activation="relu", padding="same")(x)
-        x = layers.MaxPooling2D((2, 2))(x)
+        x = layers.SeparableConv2D(
+            64, (3, 3), activation="relu", padding="same", data_format="channels_last"
+        )(x)
+        x = layers.MaxPooling2D((2, 2), data_format="channels_last")(x)
         x = layers.Dropout(0.2)(x)
 
-        x = layers.Conv2D(128, (3, 3), activation="relu", padding="same")(x)
-        x = layers.MaxPooling2D((2, 2))(x)
+        x = layers.SeparableConv2D(
+            128, (3, 3), activation="relu", padding="same", data_format="channels_last"
+        )(x)
+        x = layers.MaxPooling2D((2, 2), data_format="channels_last")(x)
         x = layers.Dropout(0.3)(x)
 
         # Flatten and dense layers
@@ -76,8 +134,12 @@ class HybridEngagementModel:
         inputs = keras.Input(shape=self.mfcc_shape, name="mfcc_input")
 
         # LSTM layers
-        x = layers.LSTM(128, return_sequences=True, dropout=0.2, recurrent_dropout=0.2)(inputs)
-        x = layers.LSTM(64, return_sequences=False, dropout=0.2, recurrent_dropout=0.2)(x)
+        # No recurrent_dropout: it forces Keras off the fused cuDNN kernel
+        # onto a slow unrolled loop. SpatialDropout1D keeps regularization
+        # on the input features instead.
+        x = layers.SpatialDropout1D(0.2)(inputs)
+        x = layers.LSTM(128, return_sequences=True, dropout=0.2)(x)
+        x = layers.LSTM(64, return_sequences=False, dropout=0.2)(x)
 
         # Dense layers
         x = layers.Dense(128, activation="relu")(x)
@@ -105,24 +167,34 @@ class HybridEngagementModel:
         cnn_features = self.cnn_model(scanpath_input)
         lstm_features = self.lstm_model(mfcc_input)
 
-        # Concatenate features
-        combined = layers.Concatenate()([cnn_features, lstm_features])
+        # Fuse branch features without materializing a concat tensor:
+        # Dense(256)(concat([a, b])) == Dense(256)(a) + Dense(256)(b), so two
+        # projections summed in place save a kernel launch and let XLA fuse
+        # the whole head (see compile_model)
+        cnn_projection = layers.Dense(256, use_bias=False, name="cnn_projection")(cnn_features)
+        lstm_projection = layers.Dense(256, name="lstm_projection")(lstm_features)
+        combined = layers.Add()([cnn_projection, lstm_projection])
 
         # Fusion layers
-        x = layers.Dense(256, activation="relu")(combined)
+        x = layers.Activation("relu")(combined)
         x = layers.Dropout(0.4)(x)
         x = layers.Dense(128, activation="relu")(x)
         x = layers.Dropout(0.3)(x)
 
         # Output layers
         # Main output: engagement classification
+        # Heads stay float32 even under mixed precision for numerical stability
         engagement_output = layers.Dense(
-            self.num_classes, activation="softmax", name="engagement_class"
+            self.num_classes, activation="softmax", dtype="float32", name="engagement_class"
         )(x)
 
         # Auxiliary outputs for monitoring
-        attention_output = layers.Dense(1, activation="sigmoid", name="attention_score")(x)
-        frustration_output = layers.Dense(1, activation="sigmoid", name="frustration_level")(x)
+        attention_output = layers.Dense(
+            1, activation="sigmoid", dtype="float32", name="attention_score"
+        )(x)
+        frustration_output = layers.Dense(
+            1, activation="sigmoid", dtype="float32", name="frustration_level"
+        )(x)
 
         # Build model
         model = keras.Model(
@@ -153,8 +225,13 @@ class HybridEngagementModel:
                 "frustration_level": 0.5,
             }
 
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        if keras.mixed_precision.global_policy().compute_dtype == "float16":
+            # Loss scaling avoids FP16 gradient underflow during training
+            optimizer = keras.mixed_precision.LossScaleOptimizer(optimizer)
+
         self.hybrid_model.compile(
-            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            optimizer=optimizer,
             loss={
                 "engagement_class": "categorical_crossentropy",
                 "attention_score": "binary_crossentropy",
@@ -166,10 +243,24 @@ class HybridEngagementModel:
                 "attention_score": ["mae"],
                 "frustration_level": ["mae"],
             },
+            # XLA fuses pointwise ops (relu/dropout/add) into their producer
+            # conv/matmul kernels, cutting intermediate memory traffic
+            jit_compile=True,
         )
 
         return self.hybrid_model
 
+    def fit_mfcc_stats(self, mfcc_data: np.ndarray):
+        """
+        Compute dataset-wide MFCC normalization stats (per coefficient)
+
+        Stored as float32 mean/inv_std so preprocess_mfcc can apply a single
+        fused (x - mean) * inv_std pass instead of per-utterance statistics.
+        """
+        flat = mfcc_data.reshape(-1, mfcc_data.shape[-1])
+        self.mfcc_mean = flat.mean(axis=0).astype(np.float32)
+        self.mfcc_inv_std = (1.0 / (flat.std(axis=0) + 1e-8)).astype(np.float32)
+
     def train(
         self,
         scanpath_data: np.ndarray,
@@ -194,6 +285,9 @@ class HybridEngagementModel:
         if self.hybrid_model is None:
             self.compile_model()
 
+        if self.mfcc_mean is None:
+            self.fit_mfcc_stats(mfcc_data)
+
         callbacks = [
             keras.callbacks.EarlyStopping(
                 monitor="val_loss", patience=10, restore_best_weights=True
@@ -202,7 +296,7 @@ class HybridEngagementModel:
                 monitor="val_loss", factor=0.5, patience=5, min_lr=1e-7
             ),
             keras.callbacks.ModelCheckpoint(
-                filepath="models/hybrid_engagement_best.h5",
+                filepath="models/hybrid_engagement_best",
                 monitor="val_engagement_class_accuracy",
                 save_best_only=True,
             ),
@@ -235,21 +329,280 @@ class HybridEngagementModel:
         Returns:
             Dictionary with engagement_class, attention_score, frustration_level
         """
+        if self.trt_context is not None:
+            return self._predict_trt(scanpath_data, mfcc_data)
+
+        if self.tflite_interpreter is not None:
+            return self._predict_tflite(scanpath_data, mfcc_data)
+
         if self.hybrid_model is None:
             raise ValueError("Model not built or loaded")
 
-        predictions = self.hybrid_model.predict(
-            {"scanpath_input": scanpath_data, "mfcc_input": mfcc_data}
+        if self._predict_step is None:
+            self._build_predict_step()
+
+        outputs = self._predict_step(
+            tf.constant(scanpath_data, dtype=tf.float32),
+            tf.constant(mfcc_data, dtype=tf.float32),
+        )
+        if not isinstance(outputs, dict):
+            # Keras 2 functional models flatten dict outputs to a list in
+            # declaration order when called through a traced tf.function
+            outputs = dict(zip(self.OUTPUT_HEADS, outputs))
+        return {key: value.numpy() for key, value in outputs.items()}
+
+    def _build_predict_step(self):
+        """
+        Pre-trace the inference function with concrete input signatures
+
+        The None batch dimension means batch 1 (request path) and batch 32
+        (micro-batching queue) share one trace instead of retracing per
+        shape; the warmup call pays the trace/XLA-compile cost up front.
+        """
+        self._predict_step = tf.function(
+            lambda sp, mf: self.hybrid_model([sp, mf], training=False),
+            input_signature=[
+                tf.TensorSpec((None,) + self.scanpath_shape, tf.float32, name="scanpath_input"),
+                tf.TensorSpec((None,) + self.mfcc_shape, tf.float32, name="mfcc_input"),
+            ],
+            # XLA-compiled forward pass; bypasses model.predict's dataset
+            # iterator overhead
+            jit_compile=True,
         )
+        self._predict_step(
+            tf.zeros((1,) + self.scanpath_shape),
+            tf.zeros((1,) + self.mfcc_shape),
+        )
+
+    def export_onnx(self, path: str = "models/hybrid_engagement_model.onnx") -> bool:
+        """Export the hybrid model to ONNX (intermediate step for TensorRT)"""
+        if self.hybrid_model is None:
+            raise ValueError("No model to export")
+
+        try:
+            import tf2onnx
+
+            input_signature = [
+                tf.TensorSpec((None,) + self.scanpath_shape, tf.float32, name="scanpath_input"),
+                tf.TensorSpec((None,) + self.mfcc_shape, tf.float32, name="mfcc_input"),
+            ]
+            tf2onnx.convert.from_keras(
+                self.hybrid_model, input_signature=input_signature, opset=17, output_path=path
+            )
+            print(f"ONNX model exported to {path}")
+            return True
+        except ImportError:
+            print("tf2onnx not installed - skipping ONNX export")
+            return False
+
+    def export_tflite_int8(
+        self,
+        rep_dataset: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        path: str = "models/hybrid_engagement_model.tflite",
+    ) -> bool:
+        """
+        Export an INT8-quantized TFLite model for the CPU deployment path
+
+        Dynamic-range quantization by default (~4x smaller weights); passing
+        a representative (scanpath, mfcc) dataset additionally calibrates
+        activations for full integer kernels where supported.
+        """
+        if self.hybrid_model is None:
+            raise ValueError("No model to export")
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.hybrid_model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+        if rep_dataset is not None:
+            scanpaths, mfccs = rep_dataset
 
-        return predictions
+            def representative_dataset():
+                for i in range(min(100, len(scanpaths))):
+                    yield [
+                        scanpaths[i : i + 1].astype(np.float32),
+                        mfccs[i : i + 1].astype(np.float32),
+                    ]
+
+            converter.representative_dataset = representative_dataset
+            # Float fallback for ops (LSTM internals) without INT8 kernels
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                tf.lite.OpsSet.TFLITE_BUILTINS,
+            ]
+
+        tflite_model = converter.convert()
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+
+        print(f"TFLite model exported to {path}")
+        return True
+
+    def load_tflite(self, path: str = "models/hybrid_engagement_model.tflite") -> bool:
+        """Load a quantized TFLite model for CPU inference (XNNPACK-delegated)"""
+        try:
+            self.tflite_interpreter = tf.lite.Interpreter(
+                model_path=path, num_threads=os.cpu_count()
+            )
+            # The signature runner keys tensors by the original Keras
+            # input/head names; raw get_output_details names are converter-
+            # mangled (StatefulPartitionedCall:N) and unsafe to match on
+            self._tflite_runner = self.tflite_interpreter.get_signature_runner()
+            print(f"TFLite model loaded from {path}")
+            return True
+        except Exception as e:
+            print(f"Error loading TFLite model: {e}")
+            self.tflite_interpreter = None
+            self._tflite_runner = None
+            return False
+
+    def _predict_tflite(
+        self,
+        scanpath_data: np.ndarray,
+        mfcc_data: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Run inference through the TFLite signature runner"""
+        outputs = self._tflite_runner(
+            scanpath_input=np.ascontiguousarray(scanpath_data, dtype=np.float32),
+            mfcc_input=np.ascontiguousarray(mfcc_data, dtype=np.float32),
+        )
+        return {key: np.asarray(value) for key, value in outputs.items()}
+
+    def export_trt(
+        self,
+        calib_samples: Tuple[np.ndarray, np.ndarray],
+        onnx_path: str = "models/hybrid_engagement_model.onnx",
+        engine_path: str = "models/hybrid_engagement_model.trt",
+        max_batch_size: int = 32,
+    ) -> bool:
+        """
+        Build an INT8 TensorRT engine from the ONNX export
+
+        Uses entropy calibration over held-out (scanpath, mfcc) samples.
+        Expected ~2-4x lower latency vs FP32 Keras predict at batch 1.
+        """
+        if not self.export_onnx(onnx_path):
+            return False
+
+        try:
+            import tensorrt as trt
+        except ImportError:
+            print("tensorrt not installed - skipping engine build")
+            return False
+
+        logger = trt.Logger(trt.Logger.WARNING)
+        builder = trt.Builder(logger)
+        network = builder.create_network(
+            1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH)
+        )
+        parser = trt.OnnxParser(network, logger)
+
+        with open(onnx_path, "rb") as f:
+            if not parser.parse(f.read()):
+                for i in range(parser.num_errors):
+                    print(f"ONNX parse error: {parser.get_error(i)}")
+                return False
+
+        config = builder.create_builder_config()
+        config.set_flag(trt.BuilderFlag.FP16)
+        config.set_flag(trt.BuilderFlag.INT8)
+        config.int8_calibrator = _EntropyCalibrator(calib_samples)
+
+        # Optimization profile covering batch 1 (request path) up to max_batch_size
+        profile = builder.create_optimization_profile()
+        profile.set_shape(
+            "scanpath_input",
+            (1,) + self.scanpath_shape,
+            (max_batch_size,) + self.scanpath_shape,
+            (max_batch_size,) + self.scanpath_shape,
+        )
+        profile.set_shape(
+            "mfcc_input",
+            (1,) + self.mfcc_shape,
+            (max_batch_size,) + self.mfcc_shape,
+            (max_batch_size,) + self.mfcc_shape,
+        )
+        config.add_optimization_profile(profile)
+
+        engine_bytes = builder.build_serialized_network(network, config)
+        if engine_bytes is None:
+            print("TensorRT engine build failed")
+            return False
+
+        with open(engine_path, "wb") as f:
+            f.write(engine_bytes)
+
+        print(f"TensorRT engine saved to {engine_path}")
+        return self.load_trt(engine_path)
+
+    def load_trt(self, engine_path: str = "models/hybrid_engagement_model.trt") -> bool:
+        """Load a serialized TensorRT engine for inference"""
+        try:
+            import tensorrt as trt
+
+            logger = trt.Logger(trt.Logger.WARNING)
+            runtime = trt.Runtime(logger)
+            with open(engine_path, "rb") as f:
+                self.trt_engine = runtime.deserialize_cuda_engine(f.read())
+            self.trt_context = self.trt_engine.create_execution_context()
+            print(f"TensorRT engine loaded from {engine_path}")
+            return True
+        except Exception as e:
+            print(f"Error loading TensorRT engine: {e}")
+            return False
+
+    def _predict_trt(
+        self,
+        scanpath_data: np.ndarray,
+        mfcc_data: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Run inference through the cached TensorRT execution context"""
+        import pycuda.autoinit  # noqa: F401 - initializes CUDA context
+        import pycuda.driver as cuda
+
+        batch = scanpath_data.shape[0]
+        scanpath_data = np.ascontiguousarray(scanpath_data, dtype=np.float32)
+        mfcc_data = np.ascontiguousarray(mfcc_data, dtype=np.float32)
+
+        self.trt_context.set_input_shape("scanpath_input", scanpath_data.shape)
+        self.trt_context.set_input_shape("mfcc_input", mfcc_data.shape)
+
+        stream = cuda.Stream()
+        outputs = {
+            "engagement_class": np.empty((batch, self.num_classes), dtype=np.float32),
+            "attention_score": np.empty((batch, 1), dtype=np.float32),
+            "frustration_level": np.empty((batch, 1), dtype=np.float32),
+        }
+
+        device_buffers = {}
+        for name, host in [("scanpath_input", scanpath_data), ("mfcc_input", mfcc_data)]:
+            device_buffers[name] = cuda.mem_alloc(host.nbytes)
+            cuda.memcpy_htod_async(device_buffers[name], host, stream)
+            self.trt_context.set_tensor_address(name, int(device_buffers[name]))
+
+        for name, host in outputs.items():
+            device_buffers[name] = cuda.mem_alloc(host.nbytes)
+            self.trt_context.set_tensor_address(name, int(device_buffers[name]))
+
+        self.trt_context.execute_async_v3(stream.handle)
+
+        for name, host in outputs.items():
+            cuda.memcpy_dtoh_async(host, device_buffers[name], stream)
+        stream.synchronize()
+
+        return outputs
 
     def save(self, path: str = "models/hybrid_engagement_model"):
-        """Save the trained model"""
+        """
+        Save the trained model as a TF SavedModel directory
+
+        SavedModel loads without Python-level graph reconstruction (~2x
+        faster cold start than HDF5). For quantized deployment artifacts
+        use export_tflite_int8/export_trt instead.
+        """
         if self.hybrid_model is None:
             raise ValueError("No model to save")
 
-        self.hybrid_model.save(f"{path}.h5")
+        self.hybrid_model.save(path, save_format="tf")
 
         # Save model config
         config = {
@@ -258,15 +611,24 @@ class HybridEngagementModel:
             "num_classes": self.num_classes,
         }
 
+        if self.mfcc_mean is not None:
+            config["mfcc_mean"] = self.mfcc_mean.tolist()
+            config["mfcc_inv_std"] = self.mfcc_inv_std.tolist()
+
         with open(f"{path}_config.json", "w") as f:
             json.dump(config, f)
 
         print(f"Model saved to {path}")
 
     def load(self, path: str = "models/hybrid_engagement_model"):
-        """Load a trained model"""
+        """Load a trained model (SavedModel, with legacy .h5 fallback)"""
         try:
-            self.hybrid_model = keras.models.load_model(f"{path}.h5")
+            # compile=False skips optimizer state rehydration - inference
+            # never needs it and it dominates load time
+            if os.path.isdir(path):
+                self.hybrid_model = keras.models.load_model(path, compile=False)
+            else:
+                self.hybrid_model = keras.models.load_model(f"{path}.h5", compile=False)
 
             # Load config
             with open(f"{path}_config.json", "r") as f:
@@ -275,6 +637,14 @@ class HybridEngagementModel:
                 self.mfcc_shape = tuple(config["mfcc_shape"])
                 self.num_classes = config["num_classes"]
 
+                if "mfcc_mean" in config:
+                    self.mfcc_mean = np.array(config["mfcc_mean"], dtype=np.float32)
+                    self.mfcc_inv_std = np.array(config["mfcc_inv_std"], dtype=np.float32)
+
+            # Trace and warm the inference function now so the first
+            # request doesn't pay for it
+            self._build_predict_step()
+
             print(f"Model loaded from {path}")
             return True
         except Exception as e:
@@ -296,6 +666,55 @@ class HybridEngagementModel:
         self.hybrid_model.summary()
 
 
+def _EntropyCalibrator(calib_samples: Tuple[np.ndarray, np.ndarray], batch_size: int = 8):
+    """
+    Build an INT8 entropy calibrator over (scanpath, mfcc) sample batches
+
+    Defined as a factory so tensorrt/pycuda stay optional imports.
+    """
+    import tensorrt as trt
+    import pycuda.autoinit  # noqa: F401
+    import pycuda.driver as cuda
+
+    class Calibrator(trt.IInt8EntropyCalibrator2):
+        def __init__(self):
+            super().__init__()
+            self.scanpaths = np.ascontiguousarray(calib_samples[0], dtype=np.float32)
+            self.mfccs = np.ascontiguousarray(calib_samples[1], dtype=np.float32)
+            self.batch_size = batch_size
+            self.index = 0
+            self.device_buffers = {
+                "scanpath_input": cuda.mem_alloc(self.scanpaths[:batch_size].nbytes),
+                "mfcc_input": cuda.mem_alloc(self.mfccs[:batch_size].nbytes),
+            }
+            self.cache_file = "models/trt_calibration.cache"
+
+        def get_batch_size(self):
+            return self.batch_size
+
+        def get_batch(self, names):
+            if self.index + self.batch_size > len(self.scanpaths):
+                return None
+            batch_slice = slice(self.index, self.index + self.batch_size)
+            cuda.memcpy_htod(self.device_buffers["scanpath_input"], self.scanpaths[batch_slice])
+            cuda.memcpy_htod(self.device_buffers["mfcc_input"], self.mfccs[batch_slice])
+            self.index += self.batch_size
+            return [int(self.device_buffers[name]) for name in names]
+
+        def read_calibration_cache(self):
+            try:
+                with open(self.cache_file, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+
+        def write_calibration_cache(self, cache):
+            with open(self.cache_file, "wb") as f:
+                f.write(cache)
+
+    return Calibrator()
+
+
 def preprocess_scanpath(
     fixations: List[Dict],
     saccades: List[Dict],
@@ -309,34 +728,54 @@ def preprocess_scanpath(
     Returns:
         3-channel image: (heatmap, fixation duration map, velocity map)
     """
-    image = np.zeros((grid_size, grid_size, 3))
-
     cell_width = screen_width / grid_size
     cell_height = screen_height / grid_size
+    n_cells = grid_size * grid_size
+
+    def _grid_coords(events: List[Dict], x_key: str, y_key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Grid cell coordinates for each event, clipped to the grid"""
+        xs = np.fromiter((e[x_key] for e in events), dtype=np.float64, count=len(events))
+        ys = np.fromiter((e[y_key] for e in events), dtype=np.float64, count=len(events))
+        # Clip both sides: off-screen gaze (negative coords) is routine
+        # WebGazer output and must land in the edge cells, not wrap
+        xs = np.clip(xs / cell_width, 0, grid_size - 1).astype(np.intp)
+        ys = np.clip(ys / cell_height, 0, grid_size - 1).astype(np.intp)
+        return xs, ys
+
+    fix_x, fix_y = _grid_coords(fixations, "x", "y")
+    sacc_x, sacc_y = _grid_coords(saccades, "toX", "toY")
+
+    durations = np.fromiter(
+        (f["duration"] for f in fixations), dtype=np.float64, count=len(fixations)
+    )
+    velocities = np.fromiter(
+        (s["velocity"] for s in saccades), dtype=np.float64, count=len(saccades)
+    )
 
-    # Channel 0: Heatmap (gaze points)
-    for fix in fixations:
-        x = int(min(fix["x"] / cell_width, grid_size - 1))
-        y = int(min(fix["y"] / cell_height, grid_size - 1))
-        image[y, x, 0] += 1
+    if NUMBA_AVAILABLE:
+        # Fused rasterize + normalize kernels, no intermediate allocations
+        image = np.zeros((grid_size, grid_size, 3), dtype=np.float32)
+        preproc_numba.rasterize_scanpath(
+            fix_x, fix_y, durations, sacc_x, sacc_y, velocities, image
+        )
+        preproc_numba.normalize_channels(image)
+        return image
 
+    # Channel 0: Heatmap (gaze points)
     # Channel 1: Fixation duration
-    for fix in fixations:
-        x = int(min(fix["x"] / cell_width, grid_size - 1))
-        y = int(min(fix["y"] / cell_height, grid_size - 1))
-        image[y, x, 1] += fix["duration"] / 1000  # normalize
-
     # Channel 2: Saccade velocity
-    for sacc in saccades:
-        x = int(min(sacc["toX"] / cell_width, grid_size - 1))
-        y = int(min(sacc["toY"] / cell_height, grid_size - 1))
-        image[y, x, 2] += sacc["velocity"] / 100  # normalize
+    image = np.stack(
+        [
+            np.bincount(fix_y * grid_size + fix_x, minlength=n_cells),
+            np.bincount(fix_y * grid_size + fix_x, weights=durations / 1000, minlength=n_cells),
+            np.bincount(sacc_y * grid_size + sacc_x, weights=velocities / 100, minlength=n_cells),
+        ],
+        axis=-1,
+    ).reshape(grid_size, grid_size, 3).astype(np.float32)
 
     # Normalize each channel
-    for c in range(3):
-        max_val = image[:, :, c].max()
-        if max_val > 0:
-            image[:, :, c] /= max_val
+    max_vals = image.max(axis=(0, 1))
+    image /= np.where(max_vals > 0, max_vals, 1)
 
     return image
 
@@ -344,31 +783,46 @@ def preprocess_scanpath(
 def preprocess_mfcc(
     mfcc_features: List[List[float]],
     target_length: int = 100,
+    mean: Optional[np.ndarray] = None,
+    inv_std: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     """
     Preprocess MFCC features for LSTM
 
-    Pads or truncates to target_length timesteps
+    Pads or truncates to target_length timesteps. When dataset-wide
+    mean/inv_std are provided (see HybridEngagementModel.fit_mfcc_stats),
+    normalization is a single fused multiply instead of two full passes
+    recomputing per-utterance statistics.
     """
-    mfcc_array = np.array(mfcc_features)
+    mfcc_array = np.asarray(mfcc_features, dtype=np.float32)
 
     if len(mfcc_array) == 0:
-        return np.zeros((target_length, 13))
-
-    if len(mfcc_array) < target_length:
-        # Pad with zeros
-        padding = np.zeros((target_length - len(mfcc_array), mfcc_array.shape[1]))
-        mfcc_array = np.vstack([mfcc_array, padding])
-    elif len(mfcc_array) > target_length:
-        # Truncate
-        mfcc_array = mfcc_array[:target_length]
-
-    # Normalize
-    mean = mfcc_array.mean(axis=0)
-    std = mfcc_array.std(axis=0)
-    mfcc_array = (mfcc_array - mean) / (std + 1e-8)
-
-    return mfcc_array
+        return np.zeros((target_length, 13), dtype=np.float32)
+
+    if NUMBA_AVAILABLE:
+        # Fused pad + normalize in one compiled pass
+        out = np.zeros((target_length, mfcc_array.shape[1]), dtype=np.float32)
+        if mean is not None and inv_std is not None:
+            preproc_numba.pad_scale_mfcc(mfcc_array, out, mean, inv_std)
+        else:
+            preproc_numba.pad_normalize_mfcc(mfcc_array, out)
+        return out
+
+    # Pad/truncate into a fresh buffer (no vstack copy)
+    n = min(len(mfcc_array), target_length)
+    out = np.empty((target_length, mfcc_array.shape[1]), dtype=mfcc_array.dtype)
+    out[:n] = mfcc_array[:n]
+    out[n:] = 0
+
+    if mean is not None and inv_std is not None:
+        np.multiply(out - mean, inv_std, out=out)
+    else:
+        # Fallback: per-utterance normalization
+        utt_mean = out.mean(axis=0)
+        utt_std = out.std(axis=0)
+        out = (out - utt_mean) / (utt_std + 1e-8)
+
+    return out
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+"""
+Micro-batching inference queue for the hybrid engagement model
+Stacks concurrent requests into a single predict() call so the GPU sees
+batch shapes instead of batch-1 forward passes
+"""
+
+import asyncio
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Matches the min/opt/max optimization profile used by the TensorRT export
+MAX_BATCH = 32
+
+# How long the worker waits for more requests before flushing a partial batch
+BATCH_TIMEOUT = 0.01  # seconds
+
+
+class InferenceQueue:
+    """
+    Background micro-batcher around HybridEngagementModel.predict
+
+    Callers await predict(); a worker task drains up to MAX_BATCH samples
+    (or whatever arrives within BATCH_TIMEOUT), runs one forward pass in a
+    thread executor, then fans results back out via futures.
+    """
+
+    def __init__(self, model, max_batch: int = MAX_BATCH, timeout: float = BATCH_TIMEOUT):
+        self.model = model
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task = None
+
+    def start(self):
+        """Launch the batching worker on the running event loop"""
+        self._worker_task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
+    async def predict(self, scanpath: np.ndarray, mfcc: np.ndarray) -> Dict[str, np.ndarray]:
+        """Queue one (scanpath, mfcc) sample and await its prediction"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((scanpath, mfcc, future))
+        return await future
+
+    async def _worker(self):
+        while True:
+            batch: List[Tuple[np.ndarray, np.ndarray, asyncio.Future]] = [
+                await self.queue.get()
+            ]
+
+            # Collect whatever else arrives within the timeout window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self.queue.get(), timeout=self.timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            # Everything from stacking to fan-out stays inside the try: an
+            # escaped exception would kill this task and leave every later
+            # caller awaiting a future that never resolves
+            try:
+                scanpaths = np.stack([item[0] for item in batch])
+                mfccs = np.stack([item[1] for item in batch])
+
+                # Run in a thread so the event loop stays free during the pass
+                predictions = await asyncio.get_running_loop().run_in_executor(
+                    None, self.model.predict, scanpaths, mfccs
+                )
+                for i, (_, _, future) in enumerate(batch):
+                    if not future.done():
+                        future.set_result(
+                            {key: value[i] for key, value in predictions.items()}
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
@@ -4,12 +4,26 @@ Handles multimodal engagement monitoring, adaptive learning, and assistive featu
 for students with diverse learning needs
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
 from typing import List, Optional, Dict, Any
+import asyncio
+import hashlib
+import os
+import numpy as np
+import orjson
 import uvicorn
 from datetime import datetime
+import cache
+from engagement_store import (
+    SessionColumns,
+    MouseEventsSoA,
+    GazePointsSoA,
+    AttentionChecksSoA,
+)
+from metrics_numba import scanpath_stats
 from models import (
     LearningProfile,
     EngagementSnapshot,
@@ -26,17 +40,125 @@ from models import (
     EngagementLevel,
 )
 
-app = FastAPI(title="Learning Companion API", version="2.0.0")
-
-# CORS middleware for frontend access
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Hybrid model serving is optional - TensorFlow may not be installed on
+# lightweight API-only deployments
+try:
+    from hybrid_model import HybridEngagementModel, preprocess_scanpath, preprocess_mfcc
+    from inference_queue import InferenceQueue
+
+    HYBRID_MODEL_AVAILABLE = True
+except ImportError:
+    HYBRID_MODEL_AVAILABLE = False
+
+# orjson serializes responses 3-10x faster than the stdlib json encoder
+app = FastAPI(
+    title="Learning Companion API",
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# Micro-batching queue around the hybrid model (started on app startup)
+inference_queue: Optional["InferenceQueue"] = None
+
+
+@app.on_event("startup")
+async def start_inference_queue():
+    """Load the trained hybrid model and start the batching worker"""
+    global inference_queue
+    if not HYBRID_MODEL_AVAILABLE:
+        return
+
+    model = HybridEngagementModel()
+    if model.load():
+        inference_queue = InferenceQueue(model)
+        inference_queue.start()
+
+
+@app.on_event("shutdown")
+async def stop_inference_queue():
+    if inference_queue is not None:
+        await inference_queue.stop()
+
+
+# Write-behind queue: small write endpoints enqueue (key, bytes) pairs and a
+# background task coalesces them into one Redis pipeline every ~5 ms, so
+# concurrent updates share a round trip instead of blocking per request
+_write_queue: Optional[asyncio.Queue] = None
+_flusher_task: Optional[asyncio.Task] = None
+WRITE_FLUSH_INTERVAL = 0.005  # seconds
+
+# Strong references to fire-and-forget analytics tasks; the event loop
+# only holds weak refs, so an unreferenced task can be collected mid-flight
+_analytics_tasks: set = set()
+
+
+def _enqueue_write(key: str, value: Dict):
+    """Queue a cache write for the next pipeline flush"""
+    _write_queue.put_nowait((key, orjson.dumps(value)))
+
+
+async def _write_flusher():
+    while True:
+        await asyncio.sleep(WRITE_FLUSH_INTERVAL)
+        if _write_queue.empty():
+            continue
+        batch = []
+        while not _write_queue.empty():
+            batch.append(_write_queue.get_nowait())
+        try:
+            await cache.set_many(batch)
+        except Exception as e:
+            # These writes were already acked to clients: a Redis blip must
+            # not drop them or kill this loop, so requeue for the next tick
+            print(f"Write flush failed, requeueing {len(batch)} writes: {e}")
+            for item in batch:
+                _write_queue.put_nowait(item)
+
+
+@app.on_event("startup")
+async def start_write_batcher():
+    global _write_queue, _flusher_task
+    if cache.enabled():
+        _write_queue = asyncio.Queue()
+        # Keep a strong reference: the event loop holds only weak refs, so
+        # an unreferenced task can be garbage-collected mid-flight
+        _flusher_task = asyncio.create_task(_write_flusher())
+
+# CORS for frontend access. Hand-rolled instead of CORSMiddleware: the
+# allowlist is two fixed origins, so a frozenset lookup replaces the
+# per-request header-set construction, and preflights short-circuit
+# before the router.
+_ALLOWED_ORIGINS = frozenset({"http://localhost:3000", "http://127.0.0.1:3000"})
+
+
+@app.middleware("http")
+async def cors(request: Request, call_next):
+    origin = request.headers.get("origin")
+
+    if request.method == "OPTIONS" and origin in _ALLOWED_ORIGINS:
+        # Preflight: answer directly without hitting the router
+        return Response(
+            status_code=204,
+            headers={
+                "Access-Control-Allow-Origin": origin,
+                "Access-Control-Allow-Credentials": "true",
+                "Access-Control-Allow-Methods": request.headers.get(
+                    "access-control-request-method", "*"
+                ),
+                "Access-Control-Allow-Headers": request.headers.get(
+                    "access-control-request-headers", "*"
+                ),
+                "Access-Control-Max-Age": "600",
+            },
+        )
+
+    response = await call_next(request)
+    if origin in _ALLOWED_ORIGINS:
+        response.headers["Access-Control-Allow-Origin"] = origin
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Vary"] = "Origin"
+    return response
+
 # Data Models
 class MouseEvent(BaseModel):
     x: float
@@ -44,8 +166,10 @@ class MouseEvent(BaseModel):
     timestamp: int
 
 class Answer(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     questionId: str
-    answer: any
+    answer: Any  # free-form: numeric entry, choice id, text, ...
     correct: bool
     timeSpent: int
 
@@ -57,7 +181,9 @@ class SessionData(BaseModel):
     sessionId: str
     startTime: int
     endTime: Optional[int] = None
-    mouseEvents: List[MouseEvent] = []
+    # Bounded so one upload cannot buffer unbounded JSON; longer streams go
+    # through the binary /mouse-chunk endpoint below
+    mouseEvents: List[MouseEvent] = Field(default_factory=list, max_length=100_000)
     answers: List[Answer] = []
     attentionChecks: List[AttentionCheck] = []
 
@@ -77,15 +203,78 @@ class ProgressUpdate(BaseModel):
     level: int
     xp: int
     coins: int
+    # Kept as a list: the frontend renders badges positionally in earned
+    # order (lib/store.ts), so ordering and duplicates are significant
     badges: List[str]
     sessionsCompleted: int
 
+# Precompiled validators for the hot request bodies: validate_json goes
+# straight through pydantic-core's Rust parser on the raw bytes, skipping
+# FastAPI's per-field body binding (SessionData can carry thousands of
+# mouse events)
+_SESSION_ADAPTER = TypeAdapter(SessionData)
+_PROGRESS_ADAPTER = TypeAdapter(ProgressUpdate)
+
 # In-memory storage (replace with database in production)
 sessions_db: Dict[str, Dict] = {}
 progress_db: Dict[str, Dict] = {}
 profiles_db: Dict[str, Dict] = {}
 learning_plans_db: Dict[str, Dict] = {}
-engagement_data_db: Dict[str, List[Dict]] = {}
+# Snapshots stored column-wise (SoA) so analytics are numpy reductions
+engagement_data_db: Dict[str, SessionColumns] = {}
+# Pre-serialized analytics blobs, written when a session lands
+# (Redis deployments keep them under analytics:{sid} instead)
+_analytics_bytes: Dict[str, bytes] = {}
+
+# Per-session MFCC ring buffers: incoming frames are written in place at a
+# rolling head instead of re-padding/truncating the full window per request
+MFCC_RING_LENGTH = 100  # matches the LSTM's 100-timestep input window
+MFCC_COEFFICIENTS = 13
+_mfcc_ring: Dict[str, np.ndarray] = {}
+_mfcc_head: Dict[str, int] = {}
+
+
+def _mfcc_frame_array(frames: List[List[float]]) -> np.ndarray:
+    """
+    Frames as a (n, MFCC_COEFFICIENTS) float32 array
+
+    The schema allows ragged frames; short ones zero-pad and long ones
+    truncate so every consumer sees the fixed coefficient width.
+    """
+    out = np.zeros((len(frames), MFCC_COEFFICIENTS), dtype=np.float32)
+    for i, frame in enumerate(frames):
+        width = min(len(frame), MFCC_COEFFICIENTS)
+        out[i, :width] = frame[:width]
+    return out
+
+
+def _mfcc_ring_append(session_id: str, frames: List[List[float]]):
+    """Write MFCC frames into the session's ring at the rolling head"""
+    ring = _mfcc_ring.get(session_id)
+    if ring is None:
+        ring = _mfcc_ring[session_id] = np.zeros(
+            (MFCC_RING_LENGTH, MFCC_COEFFICIENTS), dtype=np.float32
+        )
+        _mfcc_head[session_id] = 0
+
+    array = _mfcc_frame_array(frames)
+    head = _mfcc_head[session_id]
+    positions = (head + np.arange(len(array))) % MFCC_RING_LENGTH
+    ring[positions] = array
+    _mfcc_head[session_id] = head + len(array)
+
+
+def _mfcc_ring_window(session_id: str) -> Optional[np.ndarray]:
+    """Ordered (oldest-first) MFCC window for a session, or None if empty"""
+    ring = _mfcc_ring.get(session_id)
+    if ring is None:
+        return None
+
+    head = _mfcc_head[session_id]
+    if head <= MFCC_RING_LENGTH:
+        return ring[:head]
+    # One contiguous copy at inference time only, not per frame
+    return np.roll(ring, -(head % MFCC_RING_LENGTH), axis=0)
 
 # Default adaptive thresholds based on research guidelines (UN, APA, AAP)
 DEFAULT_THRESHOLDS = {
@@ -178,79 +367,346 @@ DEFAULT_THRESHOLDS = {
     ),
 }
 
-@app.get("/")
+# Serialized once at import so the profile hot path never re-runs Pydantic
+_THRESHOLD_DICTS = {key: value.model_dump() for key, value in DEFAULT_THRESHOLDS.items()}
+
+# Condition priority for threshold selection: most specific first
+# (condition field in DiagnosedConditions, DEFAULT_THRESHOLDS key)
+_CONDITION_PRIORITY = (
+    ("asd", "asd"),
+    ("adhd", "adhd"),
+    ("anxietyDisorder", "anxiety"),
+    ("dyslexia", "dyslexia"),
+    ("dyscalculia", "dyscalculia"),
+)
+
+# The root payload never changes, so it is serialized exactly once and the
+# same Response (with its precomputed content-length) serves every hit
+_ROOT_RESPONSE = Response(
+    content=orjson.dumps(
+        {
+            "message": "Learning Companion API",
+            "version": "2.0.0",
+            "status": "running",
+            "features": [
+                "Multimodal engagement monitoring",
+                "Eye tracking and scanpath analysis",
+                "Audio/speech analysis with MFCC",
+                "Microexpression detection",
+                "Gesture recognition",
+                "Hybrid CNN+LSTM engagement model",
+                "Adaptive thresholds for learning disorders",
+                "Personalized learning plans",
+                "Assistive technology integration",
+            ],
+        }
+    ),
+    media_type="application/json",
+)
+
+# Reused 404s for the hot lookup paths - no per-miss exception construction
+_SESSION_NOT_FOUND = HTTPException(status_code=404, detail="Session not found")
+_PROFILE_NOT_FOUND = HTTPException(status_code=404, detail="Profile not found")
+_PLAN_NOT_FOUND = HTTPException(status_code=404, detail="Learning plan not found")
+
+
+@app.get("/", response_model=None)
 async def root():
-    return {
-        "message": "Learning Companion API",
-        "version": "2.0.0",
-        "status": "running",
-        "features": [
-            "Multimodal engagement monitoring",
-            "Eye tracking and scanpath analysis",
-            "Audio/speech analysis with MFCC",
-            "Microexpression detection",
-            "Gesture recognition",
-            "Hybrid CNN+LSTM engagement model",
-            "Adaptive thresholds for learning disorders",
-            "Personalized learning plans",
-            "Assistive technology integration",
-        ],
-    }
+    return _ROOT_RESPONSE
 
-@app.post("/api/sessions")
-async def create_session(sessionData: SessionData):
+@app.post("/api/sessions", response_model=None)
+async def create_session(request: Request):
     """Store session data"""
-    sessions_db[sessionData.sessionId] = sessionData.dict()
+    try:
+        sessionData = _SESSION_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+    if cache.enabled():
+        await cache.set_session(sessionData.sessionId, sessionData.model_dump())
+    else:
+        session = sessionData.model_dump()
+        # Convert the mouse stream to SoA columns on ingest: analytics then
+        # scan three flat arrays instead of walking per-event dicts
+        session["mouseEvents"] = MouseEventsSoA.from_dicts(session["mouseEvents"])
+        session["attentionChecks"] = AttentionChecksSoA.from_dicts(
+            session["attentionChecks"]
+        )
+        # Answer payloads stay as dicts (the answer field is free-form), but
+        # the two scored columns are extracted once so analytics never loop
+        # (direct indexing: model_dump always emits every field)
+        answers = session["answers"]
+        n_answers = len(answers)
+        correct = np.empty(n_answers, dtype=np.uint8)
+        time_spent = np.empty(n_answers, dtype=np.int64)
+        for i, a in enumerate(answers):
+            correct[i] = a["correct"]
+            time_spent[i] = a["timeSpent"]
+        session["_answerColumns"] = (correct, time_spent)
+        sessions_db[sessionData.sessionId] = session
+
+    # Precompute analytics off the request path; reads serve the blob
+    task = asyncio.create_task(_compute_and_cache_analytics(sessionData.sessionId))
+    _analytics_tasks.add(task)
+    task.add_done_callback(_analytics_tasks.discard)
     return {"status": "success", "sessionId": sessionData.sessionId}
 
-@app.get("/api/sessions/{session_id}")
+@app.get("/api/sessions/{session_id}", response_model=None)
 async def get_session(session_id: str):
     """Retrieve session data"""
+    if cache.enabled():
+        raw = await cache.get_session_raw(session_id)
+        chunks = await cache.get_mouse_chunks_raw(session_id)
+        if raw is None and chunks is None:
+            raise _SESSION_NOT_FOUND
+        if chunks is None:
+            # Relay the stored orjson bytes directly - no decode/re-encode pass
+            return Response(content=raw, media_type="application/json")
+        session = _merge_mouse_chunks(
+            orjson.loads(raw) if raw is not None else {}, chunks
+        )
+        return Response(content=orjson.dumps(session), media_type="application/json")
+
     if session_id not in sessions_db:
-        raise HTTPException(status_code=404, detail="Session not found")
-    return sessions_db[session_id]
+        raise _SESSION_NOT_FOUND
+    return _inflate_session(sessions_db[session_id])
+
+
+def _inflate_session(session: Dict) -> Dict:
+    """Rebuild wire-format lists from the SoA columns for read endpoints"""
+    inflated = dict(session)
+    inflated.pop("_answerColumns", None)
+    mouse = inflated.get("mouseEvents")
+    if isinstance(mouse, MouseEventsSoA):
+        inflated["mouseEvents"] = mouse.to_dicts()
+    checks = inflated.get("attentionChecks")
+    if isinstance(checks, AttentionChecksSoA):
+        inflated["attentionChecks"] = checks.to_dicts()
+    audio = inflated.get("audioFeatures")
+    if audio:
+        inflated["audioFeatures"] = [
+            {
+                key: value.tolist() if isinstance(value, np.ndarray) else value
+                for key, value in features.items()
+            }
+            for features in audio
+        ]
+    scanpaths = inflated.get("scanpaths")
+    if scanpaths:
+        inflated["scanpaths"] = [
+            {**sp, "points": sp["points"].to_dicts()}
+            if isinstance(sp.get("points"), GazePointsSoA)
+            else sp
+            for sp in scanpaths
+        ]
+    return inflated
+
+# Wire format for binary mouse chunks: packed little-endian records,
+# matching Float32Array/BigInt64Array views over one client-side
+# ArrayBuffer. Timestamps are epoch milliseconds like MouseEvent.timestamp
+# everywhere else, which does not fit in 32 bits.
+_MOUSE_CHUNK_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("t", "<i8")])
+
+
+def _merge_mouse_chunks(session: Dict, chunks: bytes) -> Dict:
+    """Fold binary-chunked mouse events into a Redis-loaded session dict"""
+    events = np.frombuffer(chunks, dtype=_MOUSE_CHUNK_DTYPE)
+    session.setdefault("mouseEvents", []).extend(
+        {"x": float(x), "y": float(y), "timestamp": int(t)}
+        for x, y, t in zip(events["x"], events["y"], events["t"])
+    )
+    return session
+
+
+@app.post("/api/sessions/{session_id}/mouse-chunk", response_model=None)
+async def append_mouse_chunk(session_id: str, request: Request):
+    """
+    Append a binary chunk of mouse events to a session
 
-@app.post("/api/diagnostic")
+    Long recordings stream here in 16-byte packed records instead of JSON:
+    no per-event validation, and np.frombuffer is a zero-copy parse.
+    """
+    body = await request.body()
+    if len(body) % _MOUSE_CHUNK_DTYPE.itemsize != 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Body must be a multiple of 16-byte (x: f32, y: f32, t: i64) records",
+        )
+    events = np.frombuffer(body, dtype=_MOUSE_CHUNK_DTYPE)
+
+    if cache.enabled():
+        total_bytes = await cache.append_mouse_chunk(session_id, body)
+        session = await cache.get_session(session_id)
+        # Same semantics as the in-memory branch: total events for the
+        # session, JSON-ingested plus every chunk appended so far
+        count = len((session or {}).get("mouseEvents") or [])
+        count += total_bytes // _MOUSE_CHUNK_DTYPE.itemsize
+        # The cached analytics blob is stale now; refresh it off-path
+        task = asyncio.create_task(_compute_and_cache_analytics(session_id))
+        _analytics_tasks.add(task)
+        task.add_done_callback(_analytics_tasks.discard)
+        return {"status": "success", "mouseEventsCount": count}
+
+    session = sessions_db.setdefault(session_id, {})
+    mouse = session.get("mouseEvents")
+    if not isinstance(mouse, MouseEventsSoA):
+        mouse = MouseEventsSoA.from_dicts(mouse or [])
+    session["mouseEvents"] = MouseEventsSoA.from_arrays(
+        np.concatenate([mouse.x, events["x"]]),
+        np.concatenate([mouse.y, events["y"]]),
+        np.concatenate([mouse.timestamp, events["t"]]),
+    )
+    # The precomputed analytics blob is stale now; next read recomputes
+    _analytics_bytes.pop(session_id, None)
+    return {"status": "success", "mouseEventsCount": len(session["mouseEvents"])}
+
+
+@app.post("/api/diagnostic", response_model=None)
 async def submit_diagnostic(result: DiagnosticResult):
     """Process and store diagnostic results"""
     # In production, this would update user profile and initialize skill estimate
+    payload = result.model_dump()
+    if _write_queue is not None:
+        _enqueue_write(
+            f"diagnostic:{int(datetime.now().timestamp() * 1000)}", payload
+        )
     return {
         "status": "success",
         "recommendedDifficulty": result.estimatedSkillLevel,
-        "skillEstimate": result.dict()
+        "skillEstimate": payload,
     }
 
-@app.post("/api/survey/math-feeling")
+@app.post("/api/survey/math-feeling", response_model=None)
 async def submit_math_feeling(survey: MathFeelingSurvey):
     """Store math anxiety/feeling survey response"""
-    # In production, this would be stored in user profile
+    if _write_queue is not None:
+        _enqueue_write(f"survey:math-feeling:{survey.timestamp}", survey.model_dump())
     return {"status": "success", "score": survey.score}
 
-@app.post("/api/progress")
-async def update_progress(progress: ProgressUpdate):
+@app.post("/api/progress", response_model=None)
+async def update_progress(request: Request):
     """Update user progress"""
+    try:
+        progress = _PROGRESS_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
     user_id = progress.userId or "default"
+
+    if cache.enabled():
+        stored = await cache.get_progress(user_id) or {}
+        stored.update(progress.model_dump())
+        # Ack immediately; the flusher batches the write with its neighbors
+        _enqueue_write(cache.progress_key(user_id), stored)
+        return {"status": "success", "progress": stored}
+
     if user_id not in progress_db:
-        progress_db[user_id] = progress.dict()
+        progress_db[user_id] = progress.model_dump()
     else:
-        progress_db[user_id].update(progress.dict())
+        progress_db[user_id].update(progress.model_dump())
     return {"status": "success", "progress": progress_db[user_id]}
 
-@app.get("/api/progress/{user_id}")
-async def get_progress(user_id: str):
+def _etag_response(request: Request, payload: bytes) -> Response:
+    """
+    Serve `payload` with an ETag, or an empty 304 when the client already
+    holds the current version
+
+    The short private max-age lets hot pollers (the progress HUD fires
+    every couple of seconds) skip the request entirely between changes.
+    """
+    etag = '"%s"' % hashlib.blake2b(payload, digest_size=8).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=2"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+_DEFAULT_PROGRESS = {"level": 1, "xp": 0, "coins": 0, "badges": [], "sessionsCompleted": 0}
+
+
+@app.get("/api/progress/{user_id}", response_model=None)
+async def get_progress(user_id: str, request: Request):
     """Get user progress"""
-    if user_id not in progress_db:
-        return {"level": 1, "xp": 0, "coins": 0, "badges": [], "sessionsCompleted": 0}
-    return progress_db[user_id]
+    if cache.enabled():
+        stored = await cache.get_progress(user_id)
+        progress = stored if stored is not None else _DEFAULT_PROGRESS
+    else:
+        progress = progress_db.get(user_id, _DEFAULT_PROGRESS)
+    return _etag_response(request, orjson.dumps(progress))
+
+async def _compute_and_cache_analytics(session_id: str):
+    """Run the vectorized aggregation once and cache the serialized result"""
+    if cache.enabled():
+        session = await cache.get_session(session_id)
+        chunks = await cache.get_mouse_chunks_raw(session_id)
+        if session is None and chunks is None:
+            return
+        session = session or {}
+        if chunks:
+            _merge_mouse_chunks(session, chunks)
+        payload = orjson.dumps(_session_analytics(session))
+        await cache.set_analytics(session_id, payload)
+    else:
+        session = sessions_db.get(session_id)
+        if session is None:
+            return
+        _analytics_bytes[session_id] = orjson.dumps(_session_analytics(session))
+
 
-@app.get("/api/analytics/session/{session_id}")
-async def get_session_analytics(session_id: str):
+@app.get("/api/analytics/session/{session_id}", response_model=None)
+async def get_session_analytics(session_id: str, request: Request):
     """Get analytics for a session"""
+    if cache.enabled():
+        payload = await cache.get_analytics_raw(session_id)
+        if payload is None:
+            # Blob not written yet (or evicted) - compute once and backfill
+            session = await cache.get_session(session_id)
+            chunks = await cache.get_mouse_chunks_raw(session_id)
+            if session is None and chunks is None:
+                raise _SESSION_NOT_FOUND
+            session = session or {}
+            if chunks:
+                _merge_mouse_chunks(session, chunks)
+            payload = orjson.dumps(_session_analytics(session))
+            await cache.set_analytics(session_id, payload)
+        return _etag_response(request, payload)
+
     if session_id not in sessions_db:
-        raise HTTPException(status_code=404, detail="Session not found")
+        raise _SESSION_NOT_FOUND
+
+    payload = _analytics_bytes.get(session_id)
+    if payload is None:
+        session = sessions_db[session_id]
+        analytics = _cached_session_analytics(
+            session_id,
+            len(session.get("answers", [])),
+            len(session.get("attentionChecks", [])),
+            len(session.get("mouseEvents", [])),
+        )
+        payload = _analytics_bytes[session_id] = orjson.dumps(analytics)
+    return _etag_response(request, payload)
+
+
+@lru_cache(maxsize=1024)
+def _cached_session_analytics(
+    session_id: str, n_answers: int, n_checks: int, n_mouse: int
+) -> Dict:
+    """
+    Memoized analytics for the in-memory store
+
+    Sessions are append-only, so the cache key includes the list lengths:
+    a re-upload with more data recomputes, a repeat poll is a dict hit.
+    """
+    return _session_analytics(sessions_db[session_id])
+
 
-    session = sessions_db[session_id]
+def _session_analytics(session: Dict) -> Dict:
+    """Compute session analytics with numpy reductions"""
     answers = session.get("answers", [])
+    n_answers = len(answers)
+    checks = session.get("attentionChecks", [])
+    n_checks = len(checks)
+    n_mouse = len(session.get("mouseEvents", []))
 
     if not answers:
         return {
@@ -260,34 +716,52 @@ async def get_session_analytics(session_id: str):
             "attentionScore": 0
         }
 
-    correct = sum(1 for a in answers if a.get("correct", False))
-    total = len(answers)
-    avg_time = sum(a.get("timeSpent", 0) for a in answers) / total if total > 0 else 0
-
-    attention_checks = session.get("attentionChecks", [])
-    attention_score = sum(1 for ac in attention_checks if ac.get("passed", False)) / len(attention_checks) * 100 if attention_checks else 0
+    # In-memory sessions carry pre-extracted columns from ingest; sessions
+    # loaded from Redis still arrive as dict lists and get one fill pass.
+    # Both stores are written from model_dump, so every key is present and
+    # the loops index directly instead of paying dict.get's default path.
+    if "_answerColumns" in session:
+        correct, time_spent = session["_answerColumns"]
+    else:
+        correct = np.empty(n_answers, dtype=np.bool_)
+        time_spent = np.empty(n_answers, dtype=np.int64)
+        for i, a in enumerate(answers):
+            correct[i] = a["correct"]
+            time_spent[i] = a["timeSpent"]
+
+    if isinstance(checks, AttentionChecksSoA):
+        passed = checks.passed
+    else:
+        passed = np.fromiter(
+            (ac["passed"] for ac in checks),
+            dtype=np.uint8,
+            count=n_checks,
+        )
 
     return {
-        "accuracy": (correct / total * 100) if total > 0 else 0,
-        "totalQuestions": total,
-        "averageTime": avg_time,
-        "attentionScore": attention_score,
-        "mouseEventsCount": len(session.get("mouseEvents", []))
+        "accuracy": float(correct.mean()) * 100,
+        "totalQuestions": n_answers,
+        "averageTime": float(time_spent.mean()),
+        "attentionScore": float(passed.mean()) * 100 if n_checks else 0,
+        "mouseEventsCount": n_mouse
     }
 
 
 # ==================== NEW LEARNING COMPANION ENDPOINTS ====================
 
-@app.post("/api/profile")
+@app.post("/api/profile", response_model=None)
 async def create_profile(profile: LearningProfile):
     """Create or update learning profile"""
     # Determine adaptive thresholds based on diagnosed conditions
-    thresholds = _get_adaptive_thresholds(profile.diagnosedConditions.dict())
+    thresholds = _get_adaptive_thresholds(profile.diagnosedConditions.model_dump())
 
-    profile_dict = profile.dict()
+    profile_dict = profile.model_dump()
     profile_dict["engagementThresholds"] = thresholds
 
-    profiles_db[profile.userId] = profile_dict
+    if cache.enabled():
+        await cache.set_profile(profile.userId, profile_dict)
+    else:
+        profiles_db[profile.userId] = profile_dict
 
     return {
         "status": "success",
@@ -297,132 +771,256 @@ async def create_profile(profile: LearningProfile):
     }
 
 
-@app.get("/api/profile/{user_id}")
+@app.get("/api/profile/{user_id}", response_model=None)
 async def get_profile(user_id: str):
     """Get user learning profile"""
+    if cache.enabled():
+        profile = await cache.get_profile(user_id)
+        if profile is None:
+            raise _PROFILE_NOT_FOUND
+        return profile
+
     if user_id not in profiles_db:
-        raise HTTPException(status_code=404, detail="Profile not found")
+        raise _PROFILE_NOT_FOUND
     return profiles_db[user_id]
 
 
-@app.get("/api/thresholds/{user_id}")
+@app.get("/api/thresholds/{user_id}", response_model=None)
 async def get_thresholds(user_id: str):
     """Get adaptive thresholds for a user"""
-    if user_id not in profiles_db:
-        # Return default thresholds
-        return DEFAULT_THRESHOLDS["typical"].dict()
+    if cache.enabled():
+        profile = await cache.get_profile(user_id)
+    else:
+        profile = profiles_db.get(user_id)
+
+    if profile is None:
+        # Return default thresholds (copied - never hand out the shared dict)
+        return dict(_THRESHOLD_DICTS["typical"])
 
-    profile = profiles_db[user_id]
-    return profile.get("engagementThresholds", DEFAULT_THRESHOLDS["typical"].dict())
+    return profile.get("engagementThresholds") or dict(_THRESHOLD_DICTS["typical"])
 
 
-@app.post("/api/engagement/snapshot")
+@app.post("/api/engagement/snapshot", response_model=None)
 async def record_engagement_snapshot(snapshot: EngagementSnapshot):
     """Record a single engagement snapshot"""
     session_id = snapshot.sessionId
 
+    if cache.enabled():
+        count = await cache.push_snapshots(session_id, [snapshot.model_dump()])
+        return {"status": "success", "snapshotCount": count}
+
     if session_id not in engagement_data_db:
-        engagement_data_db[session_id] = []
+        engagement_data_db[session_id] = SessionColumns()
 
-    engagement_data_db[session_id].append(snapshot.dict())
+    engagement_data_db[session_id].append(snapshot.model_dump())
 
     return {"status": "success", "snapshotCount": len(engagement_data_db[session_id])}
 
 
-@app.post("/api/engagement/batch")
+@app.post("/api/engagement/batch", response_model=None)
 async def record_engagement_batch(snapshots: List[EngagementSnapshot]):
     """Record multiple engagement snapshots (batch upload)"""
+    # Group by session and extend once per group instead of per-snapshot
+    # dict lookups and appends
+    by_session: Dict[str, List[Dict]] = {}
     for snapshot in snapshots:
-        session_id = snapshot.sessionId
-        if session_id not in engagement_data_db:
-            engagement_data_db[session_id] = []
-        engagement_data_db[session_id].append(snapshot.dict())
+        by_session.setdefault(snapshot.sessionId, []).append(snapshot.model_dump())
+
+    if cache.enabled():
+        # One pipelined round trip per session instead of N RPUSHes
+        for session_id, dumps in by_session.items():
+            await cache.push_snapshots(session_id, dumps)
+    else:
+        for session_id, dumps in by_session.items():
+            engagement_data_db.setdefault(session_id, SessionColumns()).extend(dumps)
 
     return {"status": "success", "snapshotsRecorded": len(snapshots)}
 
 
-@app.get("/api/engagement/{session_id}")
+@app.get("/api/engagement/{session_id}", response_model=None)
 async def get_engagement_data(session_id: str):
     """Get engagement data for a session"""
+    if cache.enabled():
+        snapshots = await cache.get_snapshots(session_id)
+        return {"sessionId": session_id, "snapshots": snapshots, "count": len(snapshots)}
+
     if session_id not in engagement_data_db:
         return {"sessionId": session_id, "snapshots": []}
 
+    columns = engagement_data_db[session_id]
     return {
         "sessionId": session_id,
-        "snapshots": engagement_data_db[session_id],
-        "count": len(engagement_data_db[session_id])
+        "snapshots": columns.to_dicts(),
+        "count": len(columns)
     }
 
 
-@app.post("/api/engagement/analyze")
+@app.post("/api/engagement/analyze", response_model=None)
 async def analyze_engagement(analysis: HybridEngagementAnalysis):
     """Store hybrid model analysis results"""
     session_id = analysis.sessionId
 
-    if session_id not in sessions_db:
-        sessions_db[session_id] = {}
+    if cache.enabled():
+        # Read-modify-write the shared blob so get_session (which reads
+        # only Redis in this mode) sees the analysis from any worker
+        session = await cache.get_session(session_id) or {}
+        session["hybridAnalysis"] = analysis.model_dump()
+        await cache.set_session(session_id, session)
+    else:
+        if session_id not in sessions_db:
+            sessions_db[session_id] = {}
 
-    sessions_db[session_id]["hybridAnalysis"] = analysis.dict()
+        sessions_db[session_id]["hybridAnalysis"] = analysis.model_dump()
 
     # Check if intervention is needed
     if analysis.interventionNeeded:
         return {
             "status": "intervention_needed",
-            "analysis": analysis.dict(),
+            "analysis": analysis.model_dump(),
             "recommendation": "Consider taking a break or adjusting difficulty"
         }
 
-    return {"status": "success", "analysis": analysis.dict()}
+    return {"status": "success", "analysis": analysis.model_dump()}
+
+
+@app.post("/api/engagement/predict", response_model=None)
+async def predict_engagement(scanpath: Scanpath, audio: AudioFeatures):
+    """Run the hybrid model on raw scanpath + MFCC data (micro-batched)"""
+    if inference_queue is None:
+        raise HTTPException(status_code=503, detail="Hybrid model not available")
+
+    image = _scanpath_to_image(scanpath)
 
+    # Prefer the streaming ring window (already sized to the LSTM input)
+    # over re-padding the request payload
+    if audio.mfcc:
+        _mfcc_ring_append(scanpath.sessionId, audio.mfcc)
+    window = _mfcc_ring_window(scanpath.sessionId)
+    # Use the dataset stats the model was trained with (fit_mfcc_stats);
+    # per-utterance normalization would disagree with training
+    model = inference_queue.model
+    mfcc = preprocess_mfcc(
+        window if window is not None else audio.mfcc,
+        mean=model.mfcc_mean,
+        inv_std=model.mfcc_inv_std,
+    )
 
-@app.post("/api/eye-tracking/scanpath")
+    prediction = await inference_queue.predict(image, mfcc)
+
+    return {
+        "status": "success",
+        "sessionId": scanpath.sessionId,
+        "prediction": {key: value.tolist() for key, value in prediction.items()},
+    }
+
+
+@app.post("/api/eye-tracking/scanpath", response_model=None)
 async def record_scanpath(scanpath: Scanpath):
     """Record eye tracking scanpath data"""
     session_id = scanpath.sessionId
+    stored = scanpath.model_dump()
+    # Same SoA treatment as mouse events: gaze points become parallel arrays
+    points = GazePointsSoA.from_dicts(stored["points"])
+
+    if cache.enabled():
+        # The Redis blob stays plain JSON; the SoA columns are only a
+        # transient view for the stats reduction below
+        session = await cache.get_session(session_id) or {}
+        session.setdefault("scanpaths", []).append(stored)
+        await cache.set_session(session_id, session)
+        count = len(session["scanpaths"])
+    else:
+        stored["points"] = points
 
-    if session_id not in sessions_db:
-        sessions_db[session_id] = {"scanpaths": []}
+        if session_id not in sessions_db:
+            sessions_db[session_id] = {"scanpaths": []}
+
+        if "scanpaths" not in sessions_db[session_id]:
+            sessions_db[session_id]["scanpaths"] = []
 
-    if "scanpaths" not in sessions_db[session_id]:
-        sessions_db[session_id]["scanpaths"] = []
+        sessions_db[session_id]["scanpaths"].append(stored)
+        count = len(sessions_db[session_id]["scanpaths"])
 
-    sessions_db[session_id]["scanpaths"].append(scanpath.dict())
+    # Single compiled reduction over the SoA columns
+    avg_velocity, dispersion = scanpath_stats(points.x, points.y, points.timestamp)
 
-    return {"status": "success", "scanpathCount": len(sessions_db[session_id]["scanpaths"])}
+    return {
+        "status": "success",
+        "scanpathCount": count,
+        "avgSaccadeVelocity": avg_velocity,
+        "gazeDispersion": dispersion,
+    }
 
 
-@app.post("/api/audio/features")
+@app.post("/api/audio/features", response_model=None)
 async def record_audio_features(audio: AudioFeatures):
     """Record audio/speech features (MFCC)"""
+    # Stream frames into the session ring buffer for the inference path
+    if audio.sessionId and audio.mfcc:
+        _mfcc_ring_append(audio.sessionId, audio.mfcc)
+
     # Store with session ID if available
     session_id = f"audio_{audio.timestamp}"
+    stored = audio.model_dump()
+    pitch = np.asarray(stored["pitch"], dtype=np.float32)
+    energy = np.asarray(stored["energy"], dtype=np.float32)
+
+    if cache.enabled():
+        # Shared blob keeps the plain JSON lists; the arrays above only
+        # feed the response stats
+        session = await cache.get_session(session_id) or {}
+        session.setdefault("audioFeatures", []).append(stored)
+        await cache.set_session(session_id, session)
+    else:
+        if session_id not in sessions_db:
+            sessions_db[session_id] = {"audioFeatures": []}
+
+        if "audioFeatures" not in sessions_db[session_id]:
+            sessions_db[session_id]["audioFeatures"] = []
+
+        # Keep the numeric streams as float32 arrays: one vector op per
+        # reduction instead of per-element bytecode, and a quarter the memory.
+        # MFCC frames may be ragged (schema-valid), so only uniform frames
+        # become an array; ragged payloads stay as lists rather than raising.
+        mfcc = stored["mfcc"]
+        if len({len(frame) for frame in mfcc}) <= 1:
+            stored["mfcc"] = np.asarray(mfcc, dtype=np.float32)
+        stored["pitch"] = pitch
+        stored["energy"] = energy
+        sessions_db[session_id]["audioFeatures"].append(stored)
 
-    if session_id not in sessions_db:
-        sessions_db[session_id] = {"audioFeatures": []}
-
-    if "audioFeatures" not in sessions_db[session_id]:
-        sessions_db[session_id]["audioFeatures"] = []
-
-    sessions_db[session_id]["audioFeatures"].append(audio.dict())
-
-    return {"status": "success"}
+    return {
+        "status": "success",
+        "averagePitch": float(pitch.mean()) if pitch.size else 0.0,
+        "pitchVariance": float(pitch.var()) if pitch.size else 0.0,
+        "averageEnergy": float(energy.mean()) if energy.size else 0.0,
+    }
 
 
-@app.post("/api/learning-plan")
+@app.post("/api/learning-plan", response_model=None)
 async def create_learning_plan(plan: LearningPlan):
     """Create personalized learning plan"""
-    plan_dict = plan.dict()
-    learning_plans_db[plan.planId] = plan_dict
-
-    # Also associate with user
+    plan_dict = plan.model_dump()
     user_id = plan.userId
-    if user_id not in profiles_db:
-        raise HTTPException(status_code=404, detail="User profile not found")
 
-    if "learningPlans" not in profiles_db[user_id]:
-        profiles_db[user_id]["learningPlans"] = []
+    if cache.enabled():
+        await cache.set_plan(plan.planId, plan_dict)
+        profile = await cache.get_profile(user_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        profile.setdefault("learningPlans", []).append(plan.planId)
+        await cache.set_profile(user_id, profile)
+    else:
+        learning_plans_db[plan.planId] = plan_dict
+
+        # Also associate with user
+        if user_id not in profiles_db:
+            raise HTTPException(status_code=404, detail="User profile not found")
+
+        if "learningPlans" not in profiles_db[user_id]:
+            profiles_db[user_id]["learningPlans"] = []
 
-    profiles_db[user_id]["learningPlans"].append(plan.planId)
+        profiles_db[user_id]["learningPlans"].append(plan.planId)
 
     return {
         "status": "success",
@@ -431,17 +1029,33 @@ async def create_learning_plan(plan: LearningPlan):
     }
 
 
-@app.get("/api/learning-plan/{plan_id}")
+@app.get("/api/learning-plan/{plan_id}", response_model=None)
 async def get_learning_plan(plan_id: str):
     """Get learning plan by ID"""
+    if cache.enabled():
+        plan = await cache.get_plan(plan_id)
+        if plan is None:
+            raise _PLAN_NOT_FOUND
+        return plan
+
     if plan_id not in learning_plans_db:
-        raise HTTPException(status_code=404, detail="Learning plan not found")
+        raise _PLAN_NOT_FOUND
     return learning_plans_db[plan_id]
 
 
-@app.get("/api/learning-plan/user/{user_id}")
+@app.get("/api/learning-plan/user/{user_id}", response_model=None)
 async def get_user_learning_plans(user_id: str):
     """Get all learning plans for a user"""
+    if cache.enabled():
+        profile = await cache.get_profile(user_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+        fetched = await asyncio.gather(
+            *(cache.get_plan(pid) for pid in profile.get("learningPlans", []))
+        )
+        plans = [plan for plan in fetched if plan is not None]
+        return {"userId": user_id, "plans": plans, "count": len(plans)}
+
     if user_id not in profiles_db:
         raise HTTPException(status_code=404, detail="User profile not found")
 
@@ -451,58 +1065,99 @@ async def get_user_learning_plans(user_id: str):
     return {"userId": user_id, "plans": plans, "count": len(plans)}
 
 
-@app.post("/api/microexpression")
+@app.post("/api/microexpression", response_model=None)
 async def record_microexpression(data: MicroexpressionData):
     """Record microexpression detection data"""
     # Store for analysis
     session_id = f"expr_{data.timestamp}"
+
+    if cache.enabled():
+        session = await cache.get_session(session_id) or {}
+        session.setdefault("microexpressions", []).append(data.model_dump())
+        await cache.set_session(session_id, session)
+        return {"status": "success", "frustration": data.frustration, "engagement": data.engagement}
+
     if session_id not in sessions_db:
         sessions_db[session_id] = {"microexpressions": []}
 
     if "microexpressions" not in sessions_db[session_id]:
         sessions_db[session_id]["microexpressions"] = []
 
-    sessions_db[session_id]["microexpressions"].append(data.dict())
+    sessions_db[session_id]["microexpressions"].append(data.model_dump())
 
     return {"status": "success", "frustration": data.frustration, "engagement": data.engagement}
 
 
-@app.post("/api/gesture")
+@app.post("/api/gesture", response_model=None)
 async def record_gesture(data: GestureData):
     """Record gesture detection data"""
     session_id = f"gesture_{data.timestamp}"
+
+    if cache.enabled():
+        session = await cache.get_session(session_id) or {}
+        session.setdefault("gestures", []).append(data.model_dump())
+        await cache.set_session(session_id, session)
+        return {"status": "success", "gestureType": data.gestureType}
+
     if session_id not in sessions_db:
         sessions_db[session_id] = {"gestures": []}
 
     if "gestures" not in sessions_db[session_id]:
         sessions_db[session_id]["gestures"] = []
 
-    sessions_db[session_id]["gestures"].append(data.dict())
+    sessions_db[session_id]["gestures"].append(data.model_dump())
 
     return {"status": "success", "gestureType": data.gestureType}
 
 
 # Helper functions
+def _scanpath_to_image(scanpath: Scanpath):
+    """Convert a Scanpath payload to the CNN input image"""
+    fixations = [
+        {"x": point.x, "y": point.y, "duration": duration}
+        for point, duration in zip(scanpath.points, scanpath.fixationDuration)
+    ]
+    saccades = [
+        {"toX": point.x, "toY": point.y, "velocity": velocity}
+        for point, velocity in zip(scanpath.points[1:], scanpath.velocityMap)
+    ]
+    return preprocess_scanpath(fixations, saccades)
+
+
 def _get_adaptive_thresholds(conditions: Dict[str, Any]) -> Dict[str, Any]:
     """
     Determine appropriate thresholds based on diagnosed conditions
     Uses research-based guidelines from UN, APA, AAP
     """
-    # Priority order: most specific conditions first
-    if conditions.get("asd"):
-        return DEFAULT_THRESHOLDS["asd"].dict()
-    elif conditions.get("adhd"):
-        return DEFAULT_THRESHOLDS["adhd"].dict()
-    elif conditions.get("anxietyDisorder"):
-        return DEFAULT_THRESHOLDS["anxiety"].dict()
-    elif conditions.get("dyslexia"):
-        return DEFAULT_THRESHOLDS["dyslexia"].dict()
-    elif conditions.get("dyscalculia"):
-        return DEFAULT_THRESHOLDS["dyscalculia"].dict()
-    else:
-        return DEFAULT_THRESHOLDS["typical"].dict()
+    # Shallow copy: callers store these per profile, and mutating a shared
+    # precomputed dict would corrupt the defaults for every user
+    return dict(
+        next(
+            (
+                _THRESHOLD_DICTS[threshold_key]
+                for condition, threshold_key in _CONDITION_PRIORITY
+                if conditions.get(condition)
+            ),
+            _THRESHOLD_DICTS["typical"],
+        )
+    )
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop + httptools replace the selector event loop and h11 parser
+    # with C implementations (both ship with uvicorn[standard]).
+    # Multiple workers are only safe when Redis backs the stores: without
+    # it each process keeps its own sessions_db and requests shard apart.
+    # Note multi-worker also rules out reload=True (dev restarts: just
+    # run without REDIS_URL or use `uvicorn main:app --reload`).
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count() if cache.enabled() else 1,
+        log_level="warning",
+        access_log=False,
+    )
 
@@ -0,0 +1,84 @@
+"""
+Scanpath metric reductions (saccade velocity, gaze dispersion)
+JIT-compiled over the SoA gaze arrays when numba is available; the NumPy
+fallback keeps the same signature so callers never branch
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _scanpath_stats_py(x, y, t):
+    """
+    Mean saccade velocity (px/ms) and gaze dispersion over one scanpath
+
+    Dispersion is the RMS distance from the gaze centroid - a single
+    scale-free number for focused vs wandering gaze.
+    """
+    n = x.size
+    if n < 2:
+        return 0.0, 0.0
+
+    vsum = 0.0
+    vcount = 0
+    for i in range(1, n):
+        dt = t[i] - t[i - 1]
+        if dt > 0:
+            dx = x[i] - x[i - 1]
+            dy = y[i] - y[i - 1]
+            vsum += math.sqrt(dx * dx + dy * dy) / dt
+            vcount += 1
+
+    mean_x = 0.0
+    mean_y = 0.0
+    for i in range(n):
+        mean_x += x[i]
+        mean_y += y[i]
+    mean_x /= n
+    mean_y /= n
+
+    spread = 0.0
+    for i in range(n):
+        dx = x[i] - mean_x
+        dy = y[i] - mean_y
+        spread += dx * dx + dy * dy
+
+    velocity = vsum / vcount if vcount > 0 else 0.0
+    return velocity, math.sqrt(spread / n)
+
+
+def _scanpath_stats_np(x, y, t):
+    """Vectorized fallback matching _scanpath_stats_py"""
+    if x.size < 2:
+        return 0.0, 0.0
+
+    dt = np.diff(t.astype(np.float64))
+    moving = dt > 0
+    velocities = np.hypot(np.diff(x), np.diff(y))[moving] / dt[moving]
+    velocity = float(velocities.mean()) if velocities.size else 0.0
+
+    dispersion = float(np.sqrt(np.mean((x - x.mean()) ** 2 + (y - y.mean()) ** 2)))
+    return velocity, dispersion
+
+
+if NUMBA_AVAILABLE:
+    scanpath_stats = njit(cache=True, fastmath=True)(_scanpath_stats_py)
+
+    def warmup():
+        """Trigger JIT compilation (or cache load) ahead of the first request"""
+        # float32 coordinates / int64 timestamps, matching the SoA columns
+        xy = np.zeros(2, dtype=np.float32)
+        t = np.arange(2, dtype=np.int64)
+        scanpath_stats(xy, xy, t)
+
+    warmup()
+else:
+    scanpath_stats = _scanpath_stats_np
@@ -117,6 +117,7 @@ class AudioFeatures(BaseModel):
     speechRate: float  # words per minute
     pauseDuration: List[int]  # milliseconds
     timestamp: int
+    sessionId: Optional[str] = None  # enables server-side MFCC ring buffering
 
 
 class SpeechMetrics(BaseModel):
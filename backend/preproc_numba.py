@@ -0,0 +1,83 @@
+"""
+Numba-compiled kernels for scanpath/MFCC preprocessing
+Optional fast path: hybrid_model falls back to NumPy when numba is missing
+"""
+
+import numpy as np
+
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def rasterize_scanpath(fix_x, fix_y, durations, sacc_x, sacc_y, velocities, out):
+    """
+    Accumulate fixations/saccades into a (grid, grid, 3) image buffer
+
+    Single fused pass over the event arrays, writing into a caller-provided
+    output buffer so no per-request allocation survives the call.
+    """
+    for i in range(fix_x.size):
+        out[fix_y[i], fix_x[i], 0] += 1.0
+        out[fix_y[i], fix_x[i], 1] += durations[i] / 1000.0
+
+    for i in range(sacc_x.size):
+        out[sacc_y[i], sacc_x[i], 2] += velocities[i] / 100.0
+
+
+@njit(cache=True, fastmath=True)
+def normalize_channels(out):
+    """Scale each channel of a (H, W, C) image to [0, 1] in place"""
+    for c in range(out.shape[2]):
+        max_val = out[:, :, c].max()
+        if max_val > 0:
+            out[:, :, c] /= max_val
+
+
+@njit(cache=True, fastmath=True)
+def pad_scale_mfcc(mfcc, out, mean, inv_std):
+    """
+    Pad/truncate MFCC frames into `out` and apply precomputed dataset stats
+
+    One fused (x - mean) * inv_std pass per coefficient; `out` must be
+    zero-initialized with shape (target_length, n_mfcc).
+    """
+    n = min(mfcc.shape[0], out.shape[0])
+    out[:n] = mfcc[:n]
+
+    for j in range(out.shape[1]):
+        out[:, j] = (out[:, j] - mean[j]) * inv_std[j]
+
+
+@njit(cache=True, fastmath=True)
+def pad_normalize_mfcc(mfcc, out):
+    """
+    Pad/truncate MFCC frames into `out` and z-normalize per coefficient
+
+    `out` must be zero-initialized with shape (target_length, n_mfcc).
+    """
+    n = min(mfcc.shape[0], out.shape[0])
+    out[:n] = mfcc[:n]
+
+    for j in range(out.shape[1]):
+        mean = out[:, j].mean()
+        std = out[:, j].std()
+        out[:, j] = (out[:, j] - mean) / (std + 1e-8)
+
+
+def warmup():
+    """Trigger JIT compilation (or cache load) so the first request pays nothing"""
+    # Dtypes must match what hybrid_model passes at request time (float32
+    # buffers, float64 event weights) so the cached signatures get reused
+    image = np.zeros((2, 2, 3), dtype=np.float32)
+    idx = np.zeros(1, dtype=np.intp)
+    val = np.zeros(1)
+    mfcc = np.zeros((2, 2), dtype=np.float32)
+    out = np.zeros((4, 2), dtype=np.float32)
+    stats = np.ones(2, dtype=np.float32)
+    rasterize_scanpath(idx, idx, val, idx, idx, val, image)
+    normalize_channels(image)
+    pad_normalize_mfcc(mfcc, out)
+    pad_scale_mfcc(mfcc, out, stats, stats)
+
+
+warmup()